@@ -85,59 +85,76 @@ _WHITELIST = frozenset({
     'gif', 'npm', 'pip', 'git', 'aws', 'gcp', 'mcp', 'rpa',
 })
 
-# File extensions to reject
-_FILE_EXT_RE = re.compile(
-    r'^[\w./-]+\.'
-    r'(?:ts|tsx|js|jsx|py|json|yaml|yml|css|html|md|sql|sh|env|db|sqlite|txt|'
-    r'png|csv|jsonl|xml|toml|lock|cfg|ini|log|ttl|rdf|sparql|ipynb|whl|gz|'
-    r'tar|zip|pyc|appimage|dmg|exe|npz|rq)$',
-    re.IGNORECASE,
-)
-
-# Medical/ICD codes: single letter + 2+ digits, or letter(s)_digits_digits
+# Medical/ICD codes: single letter + 2+ digits (conditional — only rejected
+# for short non-alpha strings, so it stays outside the unioned pattern)
 _MEDICAL_CODE_RE = re.compile(r'^[a-z]\d{2,}', re.IGNORECASE)
-_MEDICAL_CODE2_RE = re.compile(r'^[a-z]+_\d{3}_\d{3}$', re.IGNORECASE)
-
-# snake_case with 3+ segments
-_SNAKE_3_RE = re.compile(r'^[a-z][a-z0-9]*(_[a-z0-9]+){2,}$')
-
-# Internal protocol codes: word_digits
-_PROTO_CODE_RE = re.compile(r'^[a-z]+_\d+$', re.IGNORECASE)
-
-# Starts with special chars
-_SPECIAL_START_RE = re.compile(r'^[#@$*!~.:]+')
-_CLI_FLAG_RE = re.compile(r'^--')
-
-# Numeric-prefixed phrases
-_NUMERIC_PREFIX_RE = re.compile(r'^\d+\s')
-
-# Version/decimal strings starting with digit
-_VERSION_RE = re.compile(r'^\d+\.\d')
 
-# Code syntax: brackets
-_BRACKET_RE = re.compile(r'[\[\]]')
-
-# Function calls: parentheses
-_PAREN_RE = re.compile(r'[()]')
-
-# npm scoped packages
-_NPM_SCOPE_RE = re.compile(r'^@.+/')
-
-# CSS dimensions
-_CSS_DIM_RE = re.compile(r'\d+(?:px|vh|vw|em|rem|pt|%)\b', re.IGNORECASE)
-
-# Percentage values
-_PERCENT_RE = re.compile(r'\d+%')
-
-# Paths with 2+ segments
-_PATH_RE = re.compile(r'(?:^|[^a-zA-Z])[a-zA-Z0-9_./-]+/[a-zA-Z0-9_./-]+/[a-zA-Z0-9_./-]+')
-_PATH_SIMPLE_RE = re.compile(r'^[a-zA-Z0-9_./-]+/[a-zA-Z0-9_./-]+$')
+# Dimension-like: 1184x864 (case-sensitive 'x', matched on the raw label)
+_DIM_RE = re.compile(r'^\d+x\d+', re.ASCII)
 
 # Two-char whitelist (others are too ambiguous)
 _TWO_CHAR_WHITELIST = frozenset({
     'ai', 'ui', 'db', 'os', 'ip', 'ci', 'cd', 'js', 'ts', 'go', 'ml',
 })
 
+# Clean-label fast path: lowercase words separated by single spaces never hit
+# any reject pattern (all rejects need digits, punctuation, or underscores),
+# so they can be accepted without running the reject machinery at all.
+_CLEAN_RE = re.compile(r'^[a-z]+(?: [a-z]+)*$', re.ASCII)
+
+# Unconditional anchored rejects, unioned into one alternation (matched
+# against the lowercased label; ordered by expected hit frequency).
+_REJECT_MATCH_RE = re.compile(
+    r'(?:'
+    r'[\w./-]+\.(?:ts|tsx|js|jsx|py|json|yaml|yml|css|html|md|sql|sh|env|db|'
+    r'sqlite|txt|png|csv|jsonl|xml|toml|lock|cfg|ini|log|ttl|rdf|sparql|'
+    r'ipynb|whl|gz|tar|zip|pyc|appimage|dmg|exe|npz|rq)$'  # filenames
+    r'|[#@$*!~.:\'"]'       # special/quote prefix (also covers dotfiles)
+    r'|--'                  # CLI flags
+    r'|\d+\s'               # numeric-prefixed phrases
+    r'|\d+\.\d'             # version/decimal strings
+    r'|[a-z0-9_./-]+/[a-z0-9_./-]+$'          # two-segment paths
+    r'|[a-z]+_\d{3}_\d{3}$'                   # letter(s)_digits_digits codes
+    r'|[a-z][a-z0-9]*(?:_[a-z0-9]+){2,}$'     # snake_case, 3+ segments
+    r'|[a-z]+_\d+$'                           # protocol codes: word_digits
+    r')',
+    re.ASCII,
+)
+
+# Unconditional unanchored rejects (CSS dims, percents, deep paths); code
+# syntax chars are handled by the single-pass classifier below
+_REJECT_SEARCH_RE = re.compile(
+    r'(?:'
+    r'\d+(?:px|vh|vw|em|rem|pt|%)\b'
+    r'|\d+%'
+    r'|(?:^|[^a-z])[a-z0-9_./-]+/[a-z0-9_./-]+/[a-z0-9_./-]+'
+    r')',
+    re.ASCII,
+)
+
+# Single-pass structural classifier: one walk over the label's bytes sets
+# class bits, replacing separate membership scans and letting the reject
+# regexes be skipped entirely when no digit/structural char is present.
+_F_REJECT = 1   # code syntax: [ ] ( ) *
+_F_DIGIT = 2    # 0-9 — versions, dims, percents, codes
+_F_STRUCT = 4   # . / _ -  — filenames, paths, flags, snake_case
+_F_EQUALS = 8   # = — config-like key=value
+
+_CLASS = bytearray(256)
+for _c in b'[]()*':
+    _CLASS[_c] |= _F_REJECT
+for _c in b'0123456789':
+    _CLASS[_c] |= _F_DIGIT
+for _c in b'./_-':
+    _CLASS[_c] |= _F_STRUCT
+_CLASS[ord('=')] |= _F_EQUALS
+
+# Leading chars that reject outright: specials, dotfiles, quotes
+_LEAD_REJECT = bytearray(256)
+for _c in b'#@$*!~.:\'"':
+    _LEAD_REJECT[_c] = 1
+del _c
+
 
 def is_linkable_entity(label: str) -> bool:
     """Second-level pre-filter: reject garbage entities before Wikidata linking.
@@ -147,111 +164,74 @@ def is_linkable_entity(label: str) -> bool:
     extraction filter (triple_extraction.py).
     """
     s = label.strip()
-    low = s.lower()
-
-    # Empty
-    if not s:
-        return False
-
-    # Whitelist bypass
-    if low in _WHITELIST:
-        return True
-
-    # 1. Filenames with extensions
-    if _FILE_EXT_RE.match(low):
-        return False
-
-    # 5. Starts with special chars (before other checks since many patterns start with these)
-    if _SPECIAL_START_RE.match(s) or _CLI_FLAG_RE.match(s):
-        return False
+    n = len(s)
 
-    # 6. Numeric-prefixed phrases
-    if _NUMERIC_PREFIX_RE.match(s):
+    # Tier 0: nothing shorter than 2 chars is ever linkable
+    if n < 2:
         return False
 
-    # 7. Version/decimal strings
-    if _VERSION_RE.match(s):
-        return False
+    # Extractor output is already lowercase in the common case — skip the copy
+    low = s if s.islower() else s.lower()
 
-    # 8. Two-char noise
-    if len(low) == 2 and low.isalpha() and low not in _TWO_CHAR_WHITELIST:
-        return False
+    # Tier 1: two-char tokens are decided by the whitelist alone when
+    # alphabetic; rare non-alpha two-char strings fall through
+    if n == 2:
+        if low in _TWO_CHAR_WHITELIST:
+            return True
+        if s.isalpha():
+            return False
 
-    # Single char
-    if len(s) == 1:
-        return False
-
-    # 9. Code syntax: brackets
-    if _BRACKET_RE.search(s):
-        return False
+    # Whitelist bypass
+    elif low in _WHITELIST:
+        return True
 
-    # 10. Function calls: parentheses
-    if _PAREN_RE.search(s):
-        return False
+    # Fast path: clean lowercase word(s) can't hit any reject pattern
+    if n >= 3 and _CLEAN_RE.match(s):
+        return True
 
-    # 11. npm scoped packages
-    if _NPM_SCOPE_RE.match(s):
+    # Leading special char / dotfile / quote: one table lookup
+    lead = ord(s[0])
+    if lead < 256 and _LEAD_REJECT[lead]:
         return False
 
-    # 12. CSS dimensions
-    if _CSS_DIM_RE.search(s):
-        return False
+    # Classify the whole label in one pass
+    flags = 0
+    for c in s.encode('ascii', 'ignore'):
+        flags |= _CLASS[c]
 
-    # 13. Percentage values
-    if _PERCENT_RE.search(s):
+    # Code syntax: brackets, parens, globs
+    if flags & _F_REJECT:
         return False
 
-    # 14. Paths with 2+ segments
-    if _PATH_RE.search(s) or _PATH_SIMPLE_RE.match(s):
-        return False
+    # The remaining unioned rejects all key on a digit or structural char —
+    # skip both NFA passes when neither class appeared
+    if flags & (_F_DIGIT | _F_STRUCT):
+        if _REJECT_MATCH_RE.match(low) or _REJECT_SEARCH_RE.search(low):
+            return False
+        if _DIM_RE.match(s):
+            return False
 
-    # 2. Medical/ICD codes (check after whitelist to avoid rejecting 'ai' etc.)
+    # Medical/ICD codes (check after whitelist to avoid rejecting 'ai' etc.)
     # Only reject if the ENTIRE string is a code-like pattern
     if len(low) <= 6 and _MEDICAL_CODE_RE.match(low) and not low.isalpha():
         return False
-    if _MEDICAL_CODE2_RE.match(low):
-        return False
-
-    # 3. snake_case with 3+ segments
-    if _SNAKE_3_RE.match(low):
-        return False
-
-    # 4. Internal protocol codes: word_digits
-    if _PROTO_CODE_RE.match(low):
-        return False
-
-    # Dotfiles and dot-prefixed paths
-    if low.startswith('.'):
-        return False
-
-    # Glob patterns
-    if '*' in s:
-        return False
 
     # Pure numeric
     if s.replace('.', '').replace('-', '').isdigit():
         return False
 
     # Strings with = (config-like: key=value)
-    if '=' in s and len(s.split()) <= 2:
+    if flags & _F_EQUALS and len(s.split()) <= 2:
         return False
 
     # Single punctuation char or single flag like -v
     if len(s) <= 2 and not s[0].isalnum():
         return False
 
-    # Quoted strings (starts with quote)
-    if s.startswith("'") or s.startswith('"'):
-        return False
-
     # Lone punctuation words: "% character", "& prefix"
     if s[0] in '%&' and len(s.split()) <= 2:
         return False
 
-    # Dimension-like: 1184x864, 768x1344
-    if re.match(r'^\d+x\d+', s):
-        return False
-
     return True
 
 
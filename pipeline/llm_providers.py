@@ -18,6 +18,7 @@ Supported providers:
     - ollama    : Local Ollama server (no API key, default http://localhost:11434)
 """
 
+import functools
 import json
 import os
 import sys
@@ -62,6 +63,21 @@ class LLMProvider(ABC):
 # ---------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=4)
+def _build_gemini_client(project: str | None, region: str, api_key: str | None):
+    """Build (and cache) a genai.Client for the resolved backend config.
+
+    Client construction performs credential refresh and endpoint discovery;
+    caching by backend config means all GeminiProvider instances — including
+    ones for different model names — share one client and its connection pool.
+    """
+    from google import genai
+
+    if project:
+        return genai.Client(vertexai=True, project=project, location=region)
+    return genai.Client(api_key=api_key, vertexai=False)
+
+
 class GeminiProvider(LLMProvider):
     """Google Gemini provider using the google-genai SDK.
 
@@ -74,7 +90,7 @@ class GeminiProvider(LLMProvider):
     def __init__(self, model_name: str = "gemini-2.5-flash"):
         super().__init__(model_name)
         try:
-            from google import genai
+            import google.genai  # noqa: F401 — fail fast with a clear message
         except ImportError:
             raise ImportError(
                 "google-genai package required. Install: pip install google-genai"
@@ -82,15 +98,10 @@ class GeminiProvider(LLMProvider):
 
         project = os.environ.get("ANTHROPIC_VERTEX_PROJECT_ID") or os.environ.get("GOOGLE_CLOUD_PROJECT")
         region = os.environ.get("CLOUD_ML_REGION", "us-east5")
-        use_vertex = bool(project)
 
-        if use_vertex:
-            self._client = genai.Client(
-                vertexai=True,
-                project=project,
-                location=region,
-            )
+        if project:
             backend = f"vertex-ai ({project}/{region})"
+            api_key = None
         else:
             api_key = os.environ.get("GEMINI_API_KEY")
             if not api_key:
@@ -99,9 +110,10 @@ class GeminiProvider(LLMProvider):
                     "Set ANTHROPIC_VERTEX_PROJECT_ID + CLOUD_ML_REGION for Vertex AI, "
                     "or GEMINI_API_KEY for the Gemini Developer API."
                 )
-            self._client = genai.Client(api_key=api_key, vertexai=False)
             backend = "gemini-developer-api"
 
+        self._client = _build_gemini_client(project, region, api_key)
+
         print(f"  Gemini provider: {model_name} ({backend})", file=sys.stderr)
 
     def generate_content(self, prompt: str) -> ModelResponse:
@@ -184,7 +196,12 @@ class AnthropicProvider(LLMProvider):
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
         )
-        text = response.content[0].text
+        # Join all text blocks — Claude sometimes emits multiple content
+        # blocks, and content[0] alone silently dropped the rest
+        text = "".join(
+            block.text for block in response.content
+            if getattr(block, "type", "text") == "text"
+        )
         return ModelResponse(text=text)
 
 
@@ -279,6 +296,18 @@ def get_provider(
     if model_name is None:
         model_name = _DEFAULT_MODELS[provider_name]
 
+    return _build_provider(provider_name, model_name)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_provider(provider_name: str, model_name: str) -> LLMProvider:
+    """Construct (and cache) a provider instance.
+
+    Provider __init__ does env resolution, credential lookup, and TLS/client
+    setup — repeated get_provider calls for the same (provider, model) reuse
+    the initialized client and its connection pool instead of paying that
+    again.
+    """
     cls = _PROVIDER_MAP[provider_name]
     return cls(model_name)
 
@@ -13,13 +13,26 @@ Usage:
     # [{"subject": "neo4j", "predicate": "isTypeOf", "object": "property graph"}]
 """
 
+import asyncio
+import functools
 import hashlib
 import json
+import random
 import re
 import sqlite3
 import sys
+import time
 from pathlib import Path
 
+# Optional C JSON parser (2-10x faster than stdlib on LLM payloads).
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# except clauses keep working.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 # Global counter for truncation events across the pipeline run
 truncation_count = 0
@@ -53,7 +66,7 @@ def get_cached_triples(message_uuid: str) -> list[dict] | None:
         (message_uuid,),
     ).fetchone()
     conn.close()
-    return json.loads(row[0]) if row else None
+    return _loads(row[0]) if row else None
 
 
 def cache_triples(message_uuid: str, triples: list[dict], text: str) -> None:
@@ -99,62 +112,113 @@ PREDICATE_VOCABULARY = {
     "servesAs": "X serves as / acts as Y",
 }
 
-_PREDICATE_SET = set(PREDICATE_VOCABULARY.keys())
+_PREDICATE_SET = frozenset(PREDICATE_VOCABULARY)
 
 
 # =============================================================================
 # Stopword Filter
 # =============================================================================
 
-STOPWORDS = {
+# Immutable + pre-interned: membership tests on interned inputs (see
+# normalize_entity) compare by pointer identity before falling back to
+# character comparison.
+STOPWORDS = frozenset(sys.intern(w) for w in {
     "command name", "exit", "yes", "no", "ok", "the", "it", "this",
     "that", "none", "null", "undefined", "true", "false", "n/a",
     "[object object]", "object object",
-}
+})
 
 # Known-good short terms that should always pass validation.
 # These are well-known tech abbreviations that might otherwise be caught
-# by the 2-char or other filters.
-WHITELISTED_ENTITIES = {
+# by the 2-char or other filters. frozenset like STOPWORDS above: immutable
+# and hashed once at import.
+WHITELISTED_ENTITIES = frozenset({
     "ai", "ui", "db", "os", "ip", "ci", "cd", "js", "ts", "go", "ml",
     "api", "sdk", "sql", "css", "jwt", "ssh", "ssl", "tls", "dns", "cdn",
     "gpu", "cpu", "ram", "ssd", "hdd", "cli", "gui", "ide", "nlp", "llm",
     "rag", "rdf", "owl", "uri", "url", "xml", "csv", "pdf", "svg", "png",
     "gif", "npm", "pip", "git", "aws", "gcp", "mcp", "rpa",
-}
+})
+
+# File extensions commonly seen in code paths and filenames. Frozenset
+# lookup on the rpartition'd suffix replaces a 40-branch regex alternation;
+# "file.d.ts" still hits via its final "ts" segment.
+_FILE_EXT_SET = frozenset(
+    "ts tsx js jsx py json yaml yml css html md sql sh env db sqlite txt "
+    "png csv jsonl xml toml lock cfg ini log ttl rdf sparql ipynb whl gz "
+    "tar zip jpg jpeg gif svg wasm map mjs cjs".split()
+)
 
-# File extensions commonly seen in code paths and filenames
-_FILE_EXTENSIONS = (
-    r"ts|tsx|js|jsx|py|json|yaml|yml|css|html|md|sql|sh|env|db|sqlite|txt|"
-    r"png|csv|jsonl|xml|toml|lock|cfg|ini|log|ttl|rdf|sparql|ipynb|whl|gz|"
-    r"tar|zip|jpg|jpeg|gif|svg|wasm|map|d\.ts|mjs|cjs"
+# Path-ish stem shape required before the extension dot (matches the old
+# filename pattern's prefix class)
+_RE_FILE_STEM = re.compile(r"[\w@./-][\w./-]*$", re.ASCII)
+
+# Unioned reject patterns: the unconditional regex rejects collapse into
+# three compiled alternations (anchored case-insensitive, anchored
+# case-sensitive, unanchored) so a candidate pays at most three NFA passes
+# instead of ~15 sequential pattern tests.
+_REJECT_MATCH_RE = re.compile(
+    rf"(?:"
+    rf"[a-z]\d{{2,}}(?:\.\d+)?$"                     # ICD codes: a021, k25.0
+    rf"|[a-z]+_\d{{3}}_\d{{3}}$"                     # ICD underscore codes
+    rf"|[a-z]+_\d+$"                                 # protocol codes
+    rf"|\d+\s*(?:seconds?|minutes?|hours?|days?|ms|s|m|h|kb|mb|gb|tb)\b"  # durations
+    rf"|\d+(?:st|nd|rd|th)\b"                        # ordinals
+    rf"|\d+\s+\w+s$"                                 # quantity phrases
+    rf"|\d+\s"                                       # numeric prefixes
+    rf"|\d+\.\d+"                                    # versions/decimals
+    rf"|\d+/\d+"                                     # fractions/ratios
+    rf")",
+    re.IGNORECASE | re.ASCII,
+)
+_REJECT_MATCH_CS_RE = re.compile(
+    r"(?:"
+    r"[a-z][a-z0-9]*(?:_[a-z0-9]+){2,}$"  # snake_case, 3+ segments
+    r"|\d+px"                             # dimension strings: 1400px
+    r")",
+    re.ASCII,
+)
+_REJECT_SEARCH_RE = re.compile(
+    r"(?:[\[\]()]|\d+(?:px|vh|vw|em|rem|pt|%)\b)", re.IGNORECASE | re.ASCII
 )
 
-# Precompiled regex patterns for performance (used in is_valid_entity)
-_RE_FILENAME = re.compile(rf"^[\w@./-][\w./-]*\.({_FILE_EXTENSIONS})$", re.IGNORECASE)
-_RE_ICD_SHORT = re.compile(r"^[a-z]\d{2,}(\.\d+)?$", re.IGNORECASE)
-_RE_ICD_UNDERSCORE = re.compile(r"^[a-z]+_\d{3}_\d{3}$", re.IGNORECASE)
-_RE_PROTOCOL_CODE = re.compile(r"^[a-z]+_\d+$", re.IGNORECASE)
-_RE_SNAKE_CASE_3SEG = re.compile(r"^[a-z][a-z0-9]*(_[a-z0-9]+){2,}$")
-_RE_NUMERIC_PREFIX = re.compile(r"^\d+\s")
-_RE_VERSION_DECIMAL = re.compile(r"^\d+\.\d+")
-_RE_BRACKETS = re.compile(r"[\[\]]")
-_RE_PARENS = re.compile(r"[()]")
-_RE_CSS_DIMENSION = re.compile(r"\d+(px|vh|vw|em|rem|pt|%)\b", re.IGNORECASE)
+# Leading chars that mark an entity as noise. Every rejected prefix is a
+# single char, so one memchr over this constant replaces a tuple scan (and
+# folds in the old startswith("/") path check).
+_BAD_LEAD_CHARS = "#@$*!~.:-/"
+
+_HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+
+
+def _is_ipv4(name: str) -> bool:
+    """Cheap IPv4 shape check (e.g. 10.158.0.38) without the regex engine."""
+    parts = name.split(".")
+    return len(parts) == 4 and all(p.isdigit() and len(p) <= 3 for p in parts)
+
+
+def _is_hex_string(name: str) -> bool:
+    """Hex strings / git hashes of 6+ chars (e.g. 7f9ef80)."""
+    return len(name) >= 6 and all(c in _HEX_CHARS for c in name)
 
 
+@functools.lru_cache(maxsize=8192)
 def is_valid_entity(name: str) -> bool:
     """Return False for entities that are noise rather than real technical concepts.
 
-    Filters (in order):
-    - Empty / single char
-    - Stopwords
-    - Whitelist bypass for known-good short terms
-    - Paths, special-char prefixes, filenames
-    - Medical/ICD codes, protocol codes, snake_case identifiers
-    - Numeric prefixes, versions, dimensions, percentages
-    - Code syntax fragments (brackets, parens, npm scopes)
-    - 2-char ambiguous noise
+    Results are memoized — the same entity names recur constantly across a
+    pipeline run, so repeat calls skip all regex checks.
+
+    Filters, cheapest first (every reject returns False, so ordering is
+    free after the stopword/whitelist lookups; common noise — short junk,
+    prefixed syntax, pure numbers — bails out before any regex runs):
+    - Empty / single char, stopwords, whitelist bypass
+    - 2-char ambiguous noise (whitelisted 2-char terms already passed)
+    - Special-char prefixes, paths, percentages, pure numbers
+    - IP addresses, hex strings / git hashes
+    - Filenames (extension frozenset)
+    - Medical/ICD codes, protocol codes, snake_case identifiers,
+      numeric prefixes, versions, dimensions (unioned regexes)
+    - Code syntax fragments (brackets, parens), CSS dimensions in phrases
     - 4+ word phrases
     """
     if not name or len(name) <= 1:
@@ -166,90 +230,51 @@ def is_valid_entity(name: str) -> bool:
     if name in WHITELISTED_ENTITIES:
         return True
 
-    # --- Starts with special characters (hex colors, issue refs, npm scopes,
-    #     pricing, globs, dotfiles, CLI flags, ports, DOM selectors) ---
-    if name[0] in ("#", "@", "$", "*", "!", "~", ".", ":", "-"):
-        return False
-
-    # Paths or shell commands
-    if name.startswith("/") or "\\" in name:
-        return False
-
-    # --- Filenames with extensions (e.g., __init__.py, config.json, auth-utils.ts) ---
-    if _RE_FILENAME.match(name):
-        return False
-
-    # --- Medical/ICD codes (e.g., a021, j458, k25.0, e_148) ---
-    if _RE_ICD_SHORT.match(name):
-        return False
-    # ICD pattern with double underscore segments (e.g., ansied_022_001)
-    if _RE_ICD_UNDERSCORE.match(name):
-        return False
-
-    # --- Internal protocol codes (e.g., cefaleia_007, coloproc_015, dengue_008) ---
-    if _RE_PROTOCOL_CODE.match(name):
-        return False
-
-    # --- snake_case code identifiers with 3+ segments (e.g., anthropic_api_key) ---
-    if _RE_SNAKE_CASE_3SEG.match(name):
+    # --- Two-char ambiguous noise (e.g., "aa", "bp", "ct", "df") ---
+    if len(name) == 2:
         return False
 
-    # --- Numeric-prefixed phrases (e.g., "0 bytes data", "1 llm call") ---
-    if _RE_NUMERIC_PREFIX.match(name):
+    # --- Starts with special characters (hex colors, issue refs, npm scopes,
+    #     pricing, globs, dotfiles, CLI flags, ports, DOM selectors, paths) ---
+    if name[0] in _BAD_LEAD_CHARS:
         return False
 
-    # --- Version/decimal strings (e.g., "0.3", "0.75 confidence", "5.0.0") ---
-    if _RE_VERSION_DECIMAL.match(name):
+    # Windows paths or shell commands
+    if "\\" in name:
         return False
 
-    # Dimension strings like "1400px", "800px+ width"
-    if re.match(r"^\d+px", name):
+    # --- Percentage values (e.g., "100%", "50% discount") ---
+    if "%" in name:
         return False
 
     # Pure numbers
-    if re.match(r"^\d+$", name):
+    if name.isdigit():
         return False
     # IP addresses (e.g., 10.158.0.38, 192.168.1.1)
-    if re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", name):
-        return False
-    # Duration/measurement strings (e.g., "120 seconds", "120s", "500ms", "10mb", "50 mb limit")
-    if re.match(r"^\d+\s*(seconds?|minutes?|hours?|days?|ms|s|m|h|kb|mb|gb|tb)\b", name, re.IGNORECASE):
+    if _is_ipv4(name):
         return False
     # Hex strings / git hashes (e.g., "7f9ef80", "81b9518")
-    if re.match(r"^[0-9a-f]{6,}$", name, re.IGNORECASE):
-        return False
-    # Quantity phrases (e.g., "80 tests", "3 files", "10 endpoints")
-    if re.match(r"^\d+\s+\w+s$", name):
-        return False
-    # Ordinal phrases (e.g., "7th character extensions")
-    if re.match(r"^\d+(st|nd|rd|th)\b", name, re.IGNORECASE):
-        return False
-    # Fraction/ratio strings (e.g., "8/8h", "3/4")
-    if re.match(r"^\d+/\d+", name):
-        return False
-
-    # --- CSS dimensions in phrases (e.g., "100vh", "height 280px", "max height 200px") ---
-    if _RE_CSS_DIMENSION.search(name):
-        return False
-
-    # --- Percentage values (e.g., "100%", "50% discount") ---
-    if "%" in name:
+    if _is_hex_string(name):
         return False
 
-    # --- Code syntax fragments (e.g., "[]", "candidates[0]", "[object object]") ---
-    if _RE_BRACKETS.search(name):
+    # --- Filenames (e.g., __init__.py, config.json, auth-utils.ts):
+    #     frozenset lookup on the extension, tiny stem regex for the
+    #     path-ish prefix shape ---
+    stem, dot, ext = name.rpartition(".")
+    if dot and ext.lower() in _FILE_EXT_SET and _RE_FILE_STEM.match(stem):
         return False
 
-    # --- Function calls (e.g., "_init_vertex_credentials()", "express.json()") ---
-    if _RE_PARENS.search(name):
+    # --- Anchored rejects in two unioned passes: ICD/protocol codes,
+    #     durations, ordinals, quantity phrases, numeric prefixes,
+    #     versions, fractions (case-insensitive union); snake_case 3+ segment
+    #     identifiers and px dimensions (case-sensitive union) ---
+    if _REJECT_MATCH_RE.match(name) or _REJECT_MATCH_CS_RE.match(name):
         return False
 
-    # --- npm scoped packages (e.g., "@radix-ui/react-dialog") ---
-    # (Already caught by special-char prefix check for '@', but kept for clarity)
-
-    # --- Two-char ambiguous noise (e.g., "aa", "bp", "ct", "df") ---
-    # Well-known 2-char terms are in WHITELISTED_ENTITIES and already returned True above
-    if len(name) == 2:
+    # --- Unanchored rejects, one unioned pass: code syntax fragments
+    #     (brackets, function-call parens) and CSS dimensions in phrases
+    #     (e.g., "height 280px", "100vh") ---
+    if _REJECT_SEARCH_RE.search(name):
         return False
 
     # Reject phrases with 4+ words — entities should be 1-3 words
@@ -333,45 +358,73 @@ Now extract triples from this text:
 {text}"""
 
 
+# The scaffold around the input text is static, so it is split once at import
+# time; per-call prompt construction is then a single concatenation instead of
+# rebuilding the whole ~4KB template.
+_PROMPT_PREFIX, _PROMPT_SUFFIX = (
+    build_extraction_prompt("\x00SENTINEL\x00").split("\x00SENTINEL\x00")
+)
+
+
 # =============================================================================
 # Normalization
 # =============================================================================
 
+@functools.lru_cache(maxsize=4096)
 def normalize_entity(name: str) -> str:
-    """Normalize an entity name: lowercase, strip, collapse spaces, remove trailing punctuation."""
-    name = name.strip().lower()
-    name = re.sub(r"\s+", " ", name)
-    name = name.rstrip(".,;:")
+    """Normalize an entity name: lowercase, strip, collapse spaces, remove trailing punctuation.
+
+    Memoized — entity names repeat heavily across messages, so cache hits skip
+    the string work entirely.
+    """
+    # No-arg split strips and collapses all whitespace runs in one pass —
+    # same semantics as strip() + re.sub(r"\s+", " ", ...) without the
+    # regex engine on these short strings.
+    name = " ".join(name.lower().split()).rstrip(".,;:")
+    # Intern short names so downstream set/dict lookups (STOPWORDS, dedup)
+    # can short-circuit on identity; interning huge strings is not worth it.
+    if len(name) < 32:
+        name = sys.intern(name)
     return name
 
 
+# Delimiters normalize_predicate splits on (underscores/hyphens -> spaces)
+_DELIM_TABLE = str.maketrans("_-", "  ")
+
+# Alias table specialized from PREDICATE_VOCABULARY at import time: each
+# canonical camelCase predicate maps from its case-folded form and its
+# space-separated word form. Call-time lookup folds the raw string to those
+# keys, so snake_case, hyphenated, space-separated, mixed-case, and
+# delimiter-run spellings all resolve with a single dict.get.
+_PRED_ALIAS: dict[str, str] = {}
+for _pred in PREDICATE_VOCABULARY:
+    _PRED_ALIAS[_pred.lower()] = _pred
+    _PRED_ALIAS[re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", _pred).lower()] = _pred
+del _pred
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_predicate(pred: str) -> str:
     """Normalize a predicate to match PREDICATE_VOCABULARY keys.
 
-    Tries exact match first, then converts common formats (snake_case,
-    space-separated, hyphenated) to camelCase. Falls back to 'relatedTo'.
+    Tries exact match first, then resolves common formats (snake_case,
+    space-separated, hyphenated, mixed case) through the precomputed alias
+    table. Falls back to 'relatedTo'.
+    Memoized — the raw predicate strings the LLM emits repeat constantly.
     """
     pred = pred.strip()
 
-    # Exact match
+    # Exact match. Intern so the canonical key object is returned rather
+    # than the LLM's equal-but-distinct string — downstream dict/set
+    # lookups then compare by pointer. (The alias path below already
+    # returns the interned vocabulary keys.)
     if pred in _PREDICATE_SET:
-        return pred
-
-    # Try converting various formats to camelCase
-    # Split on underscores, spaces, or hyphens
-    parts = re.split(r"[_\s-]+", pred.lower())
-    if len(parts) > 1:
-        camel = parts[0] + "".join(p.capitalize() for p in parts[1:])
-        if camel in _PREDICATE_SET:
-            return camel
+        return sys.intern(pred)
 
-    # Case-insensitive search as last resort
-    pred_lower = pred.lower()
-    for key in _PREDICATE_SET:
-        if key.lower() == pred_lower:
-            return key
-
-    return "relatedTo"
+    # Fold to the alias-table key form: lowercase, underscores/hyphens to
+    # spaces, delimiter runs collapsed by the no-arg split
+    key = " ".join(pred.lower().translate(_DELIM_TABLE).split())
+    return _PRED_ALIAS.get(key, "relatedTo")
 
 
 def normalize_triple(triple: dict) -> dict:
@@ -387,6 +440,14 @@ def normalize_triple(triple: dict) -> dict:
 # Truncation Detection & Salvage
 # =============================================================================
 
+# 256-entry lookup table for trailing characters that suggest mid-JSON
+# truncation — one index instead of a tuple membership scan per call.
+_DANGLING = bytearray(256)
+for _c in b',:"{':
+    _DANGLING[_c] = 1
+del _c
+
+
 def _is_truncated(raw: str) -> bool:
     """Detect if the LLM response was truncated mid-JSON.
 
@@ -395,46 +456,53 @@ def _is_truncated(raw: str) -> bool:
     - Ends mid-string or mid-object (trailing quote, comma, colon, open brace)
     - Bracket counting shows unclosed structures
     """
-    stripped = raw.strip()
-    if not stripped:
+    # Walk back to the last non-whitespace char instead of strip()-copying
+    # the multi-KB response; the counts below ignore whitespace anyway.
+    i = len(raw) - 1
+    while i >= 0 and raw[i].isspace():
+        i -= 1
+    if i < 0:
         return False
 
-    # Has opening bracket but no closing bracket
-    if "[" in stripped and "]" not in stripped:
+    # Unmatched brackets/braces. Each str.count is a C-level scan; the old
+    # standalone "has '[' but no ']'" membership checks walked the string
+    # twice more for a case these counts already cover.
+    if raw.count("[") > raw.count("]"):
         return True
-
-    # Count unmatched brackets/braces
-    open_brackets = stripped.count("[") - stripped.count("]")
-    open_braces = stripped.count("{") - stripped.count("}")
-    if open_brackets > 0 or open_braces > 0:
+    if raw.count("{") > raw.count("}"):
         return True
 
-    # Ends with characters that suggest mid-JSON truncation
-    if stripped[-1] in (",", ":", '"', "{"):
-        return True
+    # Ends with characters that suggest mid-JSON truncation (table lookup;
+    # ord() > 255 means a non-ASCII tail, which is never a dangling char)
+    last = ord(raw[i])
+    return last < 256 and bool(_DANGLING[last])
+
+
+_REQUIRED_TRIPLE_KEYS = frozenset({"subject", "predicate", "object"})
 
-    return False
+
+# Brace-delimited spans with no nested braces — triple objects are flat, so
+# every complete candidate matches. The character class cannot backtrack,
+# keeping findall linear over multi-KB truncated responses.
+_OBJ_RE = re.compile(r"\{[^{}]*\}")
 
 
 def _salvage_truncated_json(raw: str) -> list | None:
     """Try to salvage complete triple objects from truncated JSON.
 
-    Strategy: find all complete {"subject":...,"predicate":...,"object":...} objects
-    that appear before the truncation point.
+    One compiled findall pulls every flat {...} span at C speed; each span
+    is then json-parsed and kept if it has the three triple keys. A triple
+    whose string values contain literal braces would be missed, but such
+    values never survive entity validation anyway.
     """
-    # Find all complete JSON objects with the triple pattern
-    pattern = r'\{[^{}]*"subject"\s*:\s*"[^"]*"\s*,\s*"predicate"\s*:\s*"[^"]*"\s*,\s*"object"\s*:\s*"[^"]*"[^{}]*\}'
-    matches = re.findall(pattern, raw, re.DOTALL)
-    if not matches:
-        return None
-
     salvaged = []
-    for m in matches:
+    for span in _OBJ_RE.findall(raw):
         try:
-            obj = json.loads(m)
-            salvaged.append(obj)
+            obj = _loads(span)
         except json.JSONDecodeError:
             continue
+        if _REQUIRED_TRIPLE_KEYS <= obj.keys():
+            salvaged.append(obj)
 
     return salvaged if salvaged else None
 
@@ -443,6 +511,58 @@ def _salvage_truncated_json(raw: str) -> list | None:
 # Extraction
 # =============================================================================
 
+# Hard cap on triples kept per message (prompt asks for the top 10)
+MAX_TRIPLES_PER_MESSAGE = 10
+
+# Fallback: first JSON array embedded in a response that isn't bare JSON
+_RE_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+# Markdown-fenced payloads (```json ... ```): one precompiled search pulls
+# the fenced body, covering dict wrappers that the array fallback misses
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+# Optional msgspec fast path: a decoder specialized for the exact response
+# shape (a JSON list of {"subject","predicate","object"} objects) skips
+# generic type dispatch. Falls back to the tolerant json.loads path when
+# msgspec is not installed or the response deviates from the schema.
+try:
+    import msgspec
+
+    class _TripleRecord(msgspec.Struct, frozen=True, gc=False):
+        subject: str
+        predicate: str
+        object: str
+
+    _TRIPLE_DECODER = msgspec.json.Decoder(list[_TripleRecord])
+except ImportError:
+    _TRIPLE_DECODER = None
+
+
+def _parse_triples_well_formed(raw: str) -> list[dict] | None:
+    """Fast path: decode a well-formed triple array with the specialized decoder.
+
+    Returns None if msgspec is unavailable or the response doesn't match the
+    expected shape exactly (dict wrappers, truncation, extra fields...).
+    """
+    if _TRIPLE_DECODER is None:
+        return None
+    try:
+        records = _TRIPLE_DECODER.decode(raw)
+    except msgspec.DecodeError:
+        return None
+
+    triples = []
+    for r in records:
+        normalized = normalize_triple({"subject": r.subject, "predicate": r.predicate, "object": r.object})
+        if (normalized["subject"] and normalized["predicate"] and normalized["object"]
+                and is_valid_entity(normalized["subject"])
+                and is_valid_entity(normalized["object"])):
+            triples.append(normalized)
+            if len(triples) >= MAX_TRIPLES_PER_MESSAGE:
+                break
+    return triples
+
+
 def _parse_triples_response(raw: str) -> list[dict] | None:
     """Parse raw LLM response text into a list of triple dicts.
 
@@ -451,23 +571,37 @@ def _parse_triples_response(raw: str) -> list[dict] | None:
     """
     global truncation_count
 
-    truncated = _is_truncated(raw)
+    # Schema-specialized fast path for the common well-formed case
+    fast = _parse_triples_well_formed(raw)
+    if fast is not None:
+        return fast
+
     parsed = None
 
-    # Try direct JSON parse
+    # Try direct JSON parse first — the common case; the truncation scan
+    # only runs once the parse (and the cheaper fallbacks) have failed
     try:
-        parsed = json.loads(raw)
+        parsed = _loads(raw)
     except json.JSONDecodeError:
-        # Try to find JSON array in response
-        match = re.search(r"\[.*\]", raw, re.DOTALL)
-        if match:
+        # Markdown-fenced payload (```json ... ```)
+        fence = _FENCE_RE.search(raw)
+        if fence:
             try:
-                parsed = json.loads(match.group())
+                parsed = _loads(fence.group(1))
             except json.JSONDecodeError:
                 pass
 
+        # Bare JSON array embedded in surrounding prose
+        if parsed is None:
+            match = _RE_JSON_ARRAY.search(raw)
+            if match:
+                try:
+                    parsed = _loads(match.group())
+                except json.JSONDecodeError:
+                    pass
+
         # If still no parse and truncated, try salvaging complete objects
-        if parsed is None and truncated:
+        if parsed is None and _is_truncated(raw):
             truncation_count += 1
             print(f"[triple_extraction] Truncated response detected (total: {truncation_count}), attempting salvage: ...{raw[-80:]}", file=sys.stderr)
             parsed = _salvage_truncated_json(raw)
@@ -489,27 +623,40 @@ def _parse_triples_response(raw: str) -> list[dict] | None:
     if not isinstance(parsed, list):
         return None
 
-    # Validate and normalize
+    return _validate_triples(parsed)
+
+
+def _validate_triples(parsed: list) -> list[dict]:
+    """Validate and normalize parsed triple candidates.
+
+    Stops at the per-message cap — the LLM is instructed to put the most
+    important relationships first, so order matters and anything past the
+    10th valid triple never needs normalizing.
+    """
     triples = []
+    # Local aliases: LOAD_FAST beats LOAD_GLOBAL in this per-candidate loop,
+    # which can see hundreds of items on salvaged batches
+    _normalize = normalize_triple
+    _is_valid = is_valid_entity
     for item in parsed:
         if not isinstance(item, dict):
             continue
-        if not all(
-            k in item and isinstance(item[k], str)
-            for k in ("subject", "predicate", "object")
-        ):
+        # One C-level set comparison rejects missing-field candidates before
+        # any per-key lookups; survivors can then index directly
+        if not _REQUIRED_TRIPLE_KEYS <= item.keys():
             continue
-        normalized = normalize_triple(item)
+        subj = item["subject"]
+        pred = item["predicate"]
+        obj = item["object"]
+        if not (isinstance(subj, str) and isinstance(pred, str) and isinstance(obj, str)):
+            continue
+        normalized = _normalize(item)
         if (normalized["subject"] and normalized["predicate"] and normalized["object"]
-                and is_valid_entity(normalized["subject"])
-                and is_valid_entity(normalized["object"])):
+                and _is_valid(normalized["subject"])
+                and _is_valid(normalized["object"])):
             triples.append(normalized)
-
-    # Enforce max 10 triples per message — keep the first 10 (LLM is instructed
-    # to prioritize the most important relationships, so order matters)
-    MAX_TRIPLES_PER_MESSAGE = 10
-    if len(triples) > MAX_TRIPLES_PER_MESSAGE:
-        triples = triples[:MAX_TRIPLES_PER_MESSAGE]
+            if len(triples) >= MAX_TRIPLES_PER_MESSAGE:
+                break
 
     return triples
 
@@ -520,6 +667,63 @@ _INITIAL_MAX_CHARS = 1500
 _RETRY_MAX_CHARS = 1000
 _TRUNCATION_RETRY_MAX_CHARS = 800
 
+# Minimum stripped length for a text to be worth an API call
+_MIN_TEXT_CHARS = 30
+
+# Exponential backoff for transient API errors (429/503s): base * 2^attempt
+# with jitter, capped — immediate retries just hammer a rate-limited endpoint
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_CAP_SECONDS = 8.0
+
+
+def _backoff_sleep(attempt: int) -> None:
+    """Sleep with exponential backoff and jitter before retrying an API error."""
+    delay = min(_BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** attempt))
+    time.sleep(delay * random.uniform(0.5, 1.0))
+
+# Optional token-based budgeting: chars are a coarse proxy for tokens (dense
+# JSON/code truncates early, short prose wastes budget). With tiktoken
+# installed the caps are enforced in tokens instead; cl100k_base is a close
+# enough approximation for Gemini-class tokenizers.
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # ImportError, or no encoding data available offline
+    _ENCODING = None
+
+# Rough chars-per-token ratio used to derive token budgets from the char caps
+_CHARS_PER_TOKEN = 4
+
+
+def _trim_to_budget(text: str, max_chars: int) -> str:
+    """Trim text to the input budget for one extraction attempt.
+
+    Token-based when tiktoken is available (budget = max_chars / 4 tokens),
+    so texts that are short in tokens keep their full content even past the
+    character cap. Falls back to the plain character slice otherwise.
+    """
+    if _ENCODING is None:
+        return text[:max_chars]
+    max_tokens = max_chars // _CHARS_PER_TOKEN
+    tokens = _ENCODING.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _ENCODING.decode(tokens[:max_tokens])
+
+
+def _too_short(text: str, minimum: int = _MIN_TEXT_CHARS) -> bool:
+    """True if text has fewer than `minimum` chars after stripping whitespace.
+
+    Equivalent to len(text.strip()) < minimum but scans in from both ends
+    instead of allocating a stripped copy — messages can be tens of KB.
+    """
+    start, end = 0, len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (end - start) < minimum
+
 
 def extract_triples_gemini(model, text: str) -> list[dict]:
     """Extract knowledge triples from text using a Gemini model.
@@ -536,14 +740,16 @@ def extract_triples_gemini(model, text: str) -> list[dict]:
     Returns:
         A list of normalized triple dicts, each with 'subject', 'predicate', 'object'.
     """
-    if not text or len(text.strip()) < 30:
+    if not text or _too_short(text):
         return []
 
     max_chars = _INITIAL_MAX_CHARS
+    # Trim once up front; retries shrink this view rather than re-trimming
+    # the (potentially much larger) original text.
+    input_text = _trim_to_budget(text, max_chars)
 
     for attempt in range(1 + MAX_RETRIES):
-        input_text = text[:max_chars]
-        prompt = build_extraction_prompt(input_text)
+        prompt = _PROMPT_PREFIX + input_text + _PROMPT_SUFFIX
 
         try:
             response = model.generate_content(prompt)
@@ -551,7 +757,9 @@ def extract_triples_gemini(model, text: str) -> list[dict]:
         except Exception as e:
             print(f"[triple_extraction] API error (attempt {attempt + 1}): {e}", file=sys.stderr)
             if attempt < MAX_RETRIES:
-                max_chars = _RETRY_MAX_CHARS
+                # Transient failure: back off but keep the input size — the
+                # input wasn't the problem (unlike parse/truncation failures)
+                _backoff_sleep(attempt)
                 continue
             return []
 
@@ -573,12 +781,145 @@ def extract_triples_gemini(model, text: str) -> list[dict]:
             else:
                 max_chars = _RETRY_MAX_CHARS
                 print(f"[triple_extraction] JSON parse failed (attempt {attempt + 1}), retrying with shorter input: {raw[:100]}", file=sys.stderr)
+            input_text = _trim_to_budget(input_text, max_chars)
         else:
             print(f"[triple_extraction] JSON parse failed after {attempt + 1} attempts: {raw[:200]}", file=sys.stderr)
 
     return []
 
 
+def build_batch_extraction_prompt(texts: list[str]) -> str:
+    """Build a prompt that extracts triples for several inputs in one call.
+
+    Shares the single-text prompt scaffold (rules, vocabulary, examples) and
+    appends numbered inputs, asking for a JSON array of per-input triple
+    arrays. Amortizes the prompt-token cost across len(texts) messages.
+    """
+    scaffold = _PROMPT_PREFIX.rsplit("Now extract triples from this text:", 1)[0]
+    numbered = "\n\n".join(f"INPUT {i + 1}:\n{t}" for i, t in enumerate(texts))
+    n = len(texts)
+    return (
+        f"{scaffold}Now extract triples from EACH of the following {n} inputs. "
+        f"Return a single JSON array with exactly {n} elements, where element i "
+        f"is the array of triples for INPUT i (use [] for inputs with no "
+        f"extractable technical knowledge).\n\n{numbered}"
+    )
+
+
+def _parse_batch_response(raw: str, n: int) -> list[list[dict]] | None:
+    """Parse a batched response into n per-input triple lists.
+
+    Returns None if the response can't be mapped back to the inputs (wrong
+    element count, not a list of lists) — callers fall back to per-text calls.
+    """
+    try:
+        parsed = _loads(raw)
+    except json.JSONDecodeError:
+        match = _RE_JSON_ARRAY.search(raw)
+        if not match:
+            return None
+        try:
+            parsed = _loads(match.group())
+        except json.JSONDecodeError:
+            return None
+
+    # Handle dict wrapper (e.g., {"results": [...]})
+    if isinstance(parsed, dict):
+        for key in parsed:
+            if isinstance(parsed[key], list):
+                parsed = parsed[key]
+                break
+
+    if not isinstance(parsed, list) or len(parsed) != n:
+        return None
+
+    return [
+        _validate_triples(inner) if isinstance(inner, list) else []
+        for inner in parsed
+    ]
+
+
+def extract_triples_gemini_batch(model, texts: list[str]) -> list[list[dict]]:
+    """Extract triples for several texts with a single LLM call.
+
+    Collapses len(texts) round-trips (and prompt-token payments) into one.
+    Texts below the minimum length get [] without an API call. If the batched
+    response can't be parsed or mapped back by index, falls back to per-text
+    extract_triples_gemini so no input is silently dropped.
+
+    Returns one list of normalized triple dicts per input text, in order.
+    """
+    results: list[list[dict] | None] = [None] * len(texts)
+    send_indices = []
+    for i, text in enumerate(texts):
+        if not text or _too_short(text):
+            results[i] = []
+        else:
+            send_indices.append(i)
+
+    if send_indices:
+        batch_texts = [_trim_to_budget(texts[i], _INITIAL_MAX_CHARS) for i in send_indices]
+        prompt = build_batch_extraction_prompt(batch_texts)
+
+        parsed = None
+        try:
+            response = model.generate_content(prompt)
+            parsed = _parse_batch_response(response.text.strip(), len(batch_texts))
+        except Exception as e:
+            print(f"[triple_extraction] Batch API error: {e}", file=sys.stderr)
+
+        if parsed is not None:
+            for i, triples in zip(send_indices, parsed):
+                results[i] = triples
+        else:
+            print(
+                f"[triple_extraction] Batch response unusable, falling back to "
+                f"{len(send_indices)} per-text calls",
+                file=sys.stderr,
+            )
+            for i in send_indices:
+                results[i] = extract_triples_gemini(model, texts[i])
+
+    return results  # type: ignore[return-value]
+
+
+async def extract_triples_gemini_async(model, text: str) -> list[dict]:
+    """Async sibling of extract_triples_gemini.
+
+    The LLM providers expose a synchronous generate_content(), so the full
+    extraction (including retry/salvage logic) runs in a worker thread. This
+    lets callers overlap many network round-trips with asyncio.
+    """
+    return await asyncio.to_thread(extract_triples_gemini, model, text)
+
+
+def extract_triples_many(model, texts: list[str], concurrency: int = 16) -> list[list[dict]]:
+    """Extract triples for many texts concurrently.
+
+    Overlaps API round-trips with a bounded semaphore (default 16 in-flight
+    requests) instead of calling extract_triples_gemini serially. Results are
+    returned in input order.
+
+    Args:
+        model: An LLM provider instance (from llm_providers.get_provider).
+        texts: Texts to extract triples from.
+        concurrency: Maximum number of in-flight API calls.
+
+    Returns:
+        One list of normalized triple dicts per input text, in input order.
+    """
+    async def _run() -> list[list[dict]]:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(text: str) -> list[dict]:
+            async with sem:
+                return await extract_triples_gemini_async(model, text)
+
+        return await asyncio.gather(*[_one(t) for t in texts])
+
+    return asyncio.run(_run())
+
+
 def get_truncation_count() -> int:
     """Return the total number of truncation events detected during this run."""
     return truncation_count
@@ -22,26 +22,81 @@ Usage:
     # Skip triple extraction (structure only)
     python -m pipeline.warp_to_rdf output.ttl --conversation 0 --skip-extraction
 
+    # Process every conversation concurrently into a directory of .ttl files
+    python -m pipeline.warp_to_rdf output/warp/ --all --workers 4
+
     # Custom Gemini model
     python -m pipeline.warp_to_rdf output.ttl --conversation 0 --model gemini-2.5-pro
 """
 
+import argparse
+import asyncio
+import functools
+import hashlib
 import json
+import os
 import sqlite3
 import sys
+import threading
 import time
-import argparse
 from pathlib import Path
 
 from rdflib import Literal
 from rdflib.namespace import RDF, DCTERMS, XSD
 
+# Optional C JSON parser — same fallback pattern as triple_extraction
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 from pipeline.common import (
     PROV, SIOC, DEVKG, DATA,
     slug, create_graph, create_session_node, create_developer_node,
     create_model_node, create_message_node, add_triples_to_graph,
 )
-from pipeline.triple_extraction import extract_triples_gemini
+from pipeline.triple_extraction import extract_triples_gemini_batch
+
+# Exchanges sent to the LLM per call; amortizes prompt tokens and round-trips
+EXTRACTION_BATCH_SIZE = 8
+
+# Maximum batch calls in flight at once. The provider SDKs are synchronous,
+# so each in-flight call occupies a worker thread; 8 overlaps network RTTs
+# without blowing past provider QPS limits.
+EXTRACTION_CONCURRENCY = 8
+
+# Requests-per-minute budget for the token-bucket throttle (override with
+# the GEMINI_RPM env var; 300 matches gemini-2.5-flash's documented quota)
+DEFAULT_RPM = 300
+
+
+class RateLimiter:
+    """Token-bucket request throttle calibrated to a requests-per-minute quota.
+
+    acquire() is zero-latency while tokens remain and only sleeps once the
+    bucket is drained — unlike a fixed per-call sleep, full quota headroom is
+    usable. Thread-safe: extraction batches call acquire() from worker threads.
+    """
+
+    def __init__(self, rpm: int):
+        self.rate = rpm / 60.0
+        self.capacity = float(rpm)
+        self.tokens = float(rpm)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until it is available if the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 0.0
+            else:
+                self.tokens -= 1.0
 
 
 DEFAULT_DB_PATH = (
@@ -56,36 +111,45 @@ DEFAULT_DB_PATH = (
 )
 
 
-def get_conversations(db_path: str) -> list[dict]:
-    """Return all conversations from agent_conversations, ordered by last_modified_at desc."""
+def open_db(db_path: str) -> sqlite3.Connection:
+    """Open the Warp database once for the whole run (dict-style rows)."""
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT id, conversation_id, last_modified_at "
-            "FROM agent_conversations ORDER BY last_modified_at DESC"
-        ).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+    return conn
 
 
-def get_exchanges(db_path: str, conversation_id: str) -> list[dict]:
-    """Return all ai_queries for a conversation, ordered by start_ts."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT exchange_id, conversation_id, start_ts, input, "
-            "working_directory, output_status, model_id "
-            "FROM ai_queries WHERE conversation_id = ? ORDER BY start_ts",
-            (conversation_id,),
-        ).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+def get_conversations(conn: sqlite3.Connection) -> list[dict]:
+    """Return all conversations from agent_conversations, ordered by last_modified_at desc."""
+    rows = conn.execute(
+        "SELECT id, conversation_id, last_modified_at "
+        "FROM agent_conversations ORDER BY last_modified_at DESC"
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def iter_exchanges(conn: sqlite3.Connection, conversation_id: str):
+    """Yield ai_queries rows for a conversation, ordered by start_ts.
+
+    Streams row-by-row from the cursor instead of materializing the full
+    result — long-history databases hold conversations with thousands of
+    multi-KB input payloads. The connection must stay open while iterating.
+    """
+    cursor = conn.execute(
+        "SELECT exchange_id, conversation_id, start_ts, input, "
+        "working_directory, output_status, model_id "
+        "FROM ai_queries WHERE conversation_id = ? ORDER BY start_ts",
+        (conversation_id,),
+    )
+    for row in cursor:
+        yield dict(row)
 
 
+def get_exchanges(conn: sqlite3.Connection, conversation_id: str) -> list[dict]:
+    """Materialized convenience wrapper around iter_exchanges."""
+    return list(iter_exchanges(conn, conversation_id))
+
+
+@functools.lru_cache(maxsize=4096)
 def extract_query_text(input_json: str) -> str:
     """Extract user query text from the ai_queries.input JSON field.
 
@@ -94,9 +158,19 @@ def extract_query_text(input_json: str) -> str:
         {"ActionResult": {...}}
 
     We extract all Query.text values and join them.
+
+    Memoized on the raw input string: the same rows are decoded by the
+    listing preview, the substantive-exchange filter, and build_graph, so
+    repeat calls skip the JSON parse entirely.
     """
+    # Fast path: only JSON arrays can hold Query objects. Many rows are
+    # empty/boilerplate ("null", "{}"), and this 1-byte check skips the
+    # parse for all of them.
+    if not input_json or input_json[:1] != "[":
+        return ""
+
     try:
-        items = json.loads(input_json)
+        items = _loads(input_json)
     except (json.JSONDecodeError, TypeError):
         return ""
 
@@ -112,45 +186,79 @@ def extract_query_text(input_json: str) -> str:
     return "\n".join(texts)
 
 
-def list_conversations(db_path: str) -> None:
-    """Print available conversations with index, id, date, and exchange count."""
-    conversations = get_conversations(db_path)
+def list_conversations(conn: sqlite3.Connection, db_path: str) -> None:
+    """Print available conversations with index, id, date, and exchange count.
+
+    Per-conversation stats come from two aggregated queries (GROUP BY counts
+    and a window-function first-input) instead of 2N one-shot queries inside
+    the listing loop.
+    """
+    conversations = get_conversations(conn)
     if not conversations:
         print("No conversations found in database.", file=sys.stderr)
         return
 
-    conn = sqlite3.connect(db_path)
-    try:
-        print(f"\nFound {len(conversations)} conversations in {db_path}\n")
-        print(f"{'Idx':>4}  {'Last Modified':<22}  {'Exchanges':>9}  {'Conversation ID'}")
-        print("-" * 90)
-
-        for idx, conv in enumerate(conversations):
-            cid = conv["conversation_id"]
-            count = conn.execute(
-                "SELECT COUNT(*) FROM ai_queries WHERE conversation_id = ?",
-                (cid,),
-            ).fetchone()[0]
-
-            # Get first query text as preview
-            preview = ""
-            first = conn.execute(
-                "SELECT input FROM ai_queries WHERE conversation_id = ? ORDER BY start_ts LIMIT 1",
-                (cid,),
-            ).fetchone()
-            if first:
-                text = extract_query_text(first[0])
-                if text:
-                    preview = text[:60].replace("\n", " ")
-                    if len(text) > 60:
-                        preview += "..."
-
-            modified = conv["last_modified_at"] or "unknown"
-            print(f"{idx:>4}  {modified:<22}  {count:>9}  {cid[:36]}")
-            if preview:
-                print(f"      -> {preview}")
-    finally:
-        conn.close()
+    counts = {
+        row["conversation_id"]: row["n"]
+        for row in conn.execute(
+            "SELECT conversation_id, COUNT(*) AS n FROM ai_queries GROUP BY conversation_id"
+        )
+    }
+    first_inputs = {
+        row["conversation_id"]: row["input"]
+        for row in conn.execute(
+            "SELECT conversation_id, input FROM ("
+            "  SELECT conversation_id, input, "
+            "         ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY start_ts) AS rn "
+            "  FROM ai_queries"
+            ") WHERE rn = 1"
+        )
+    }
+
+    print(f"\nFound {len(conversations)} conversations in {db_path}\n")
+    print(f"{'Idx':>4}  {'Last Modified':<22}  {'Exchanges':>9}  {'Conversation ID'}")
+    print("-" * 90)
+
+    for idx, conv in enumerate(conversations):
+        cid = conv["conversation_id"]
+        count = counts.get(cid, 0)
+
+        # Get first query text as preview
+        preview = ""
+        first = first_inputs.get(cid)
+        if first:
+            text = extract_query_text(first)
+            if text:
+                preview = text[:60].replace("\n", " ")
+                if len(text) > 60:
+                    preview += "..."
+
+        modified = conv["last_modified_at"] or "unknown"
+        print(f"{idx:>4}  {modified:<22}  {count:>9}  {cid[:36]}")
+        if preview:
+            print(f"      -> {preview}")
+
+
+async def _extract_batches(model, batches: list[list[tuple]]) -> list[list[list[dict]]]:
+    """Run batched extraction calls concurrently under a bounded semaphore.
+
+    Each batch call runs in a worker thread (the provider SDKs are sync),
+    gated by a token-bucket rate limiter instead of a fixed sleep — calls
+    proceed immediately while quota headroom remains. Results are returned
+    in batch order.
+    """
+    sem = asyncio.Semaphore(EXTRACTION_CONCURRENCY)
+    limiter = RateLimiter(int(os.environ.get("GEMINI_RPM", DEFAULT_RPM)))
+
+    def _call(batch: list[tuple]) -> list[list[dict]]:
+        limiter.acquire()
+        return extract_triples_gemini_batch(model, [text for _, text in batch])
+
+    async def _one(batch: list[tuple]) -> list[list[dict]]:
+        async with sem:
+            return await asyncio.to_thread(_call, batch)
+
+    return await asyncio.gather(*[_one(b) for b in batches])
 
 
 def build_graph(
@@ -164,7 +272,11 @@ def build_graph(
     g = create_graph()
     developer_uri = create_developer_node(g, developer)
 
-    exchanges = get_exchanges(db_path, conversation_id)
+    conn = open_db(db_path)
+    try:
+        exchanges = get_exchanges(conn, conversation_id)
+    finally:
+        conn.close()
     if not exchanges:
         print(f"No exchanges found for conversation {conversation_id}", file=sys.stderr)
         return g
@@ -185,6 +297,7 @@ def build_graph(
     models_seen = set()
     triple_count = 0
     msg_count = 0
+    pending = []  # (msg_uri, query_text) awaiting batched extraction
 
     for i, exchange in enumerate(exchanges):
         exchange_id = exchange["exchange_id"]
@@ -217,20 +330,47 @@ def build_graph(
             model_node_uri = create_model_node(g, model_id)
             g.add((session_uri, PROV.wasAssociatedWith, model_node_uri))
 
-        # Triple extraction
+        # Buffer for batched triple extraction below
         if not skip_extraction and model is not None and query_text.strip():
-            triples = extract_triples_gemini(model, query_text)
+            pending.append((msg_uri, query_text))
+
+    # Dedupe identical query texts (resubmitted prompts, "continue"/"retry"
+    # repeats) by content hash so each distinct text costs one extraction —
+    # no API call, no rate-limit token for the repeats.
+    digests = []
+    unique_texts: dict[str, str] = {}  # digest -> query_text
+    for _, text in pending:
+        digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        digests.append(digest)
+        unique_texts.setdefault(digest, text)
+
+    # Triple extraction: batches of EXTRACTION_BATCH_SIZE unique texts, run
+    # concurrently under a bounded semaphore so network round-trips overlap.
+    # Graph writes stay on this thread (rdflib graphs aren't thread-safe)
+    # and happen in exchange order once all batches complete.
+    unique_items = list(unique_texts.items())
+    batches = [
+        unique_items[start:start + EXTRACTION_BATCH_SIZE]
+        for start in range(0, len(unique_items), EXTRACTION_BATCH_SIZE)
+    ]
+    if batches:
+        all_results = asyncio.run(_extract_batches(model, batches))
+        triples_by_digest = {}
+        for batch_idx, (batch, batch_results) in enumerate(zip(batches, all_results)):
+            for (digest, _), triples in zip(batch, batch_results):
+                triples_by_digest[digest] = triples
+
+            print(
+                f"  [batch {batch_idx + 1}/{len(batches)}] "
+                f"{sum(len(t) for t in batch_results)} triples extracted",
+                file=sys.stderr,
+            )
+
+        for (msg_uri, _), digest in zip(pending, digests):
+            triples = triples_by_digest.get(digest, [])
             add_triples_to_graph(g, msg_uri, triples, session_uri)
             triple_count += len(triples)
 
-            if triples:
-                print(
-                    f"  [{i+1}/{len(exchanges)}] {len(triples)} triples extracted",
-                    file=sys.stderr,
-                )
-
-            time.sleep(0.5)
-
     print(
         f"  Processed: {msg_count} exchanges, {len(models_seen)} models, "
         f"{triple_count} knowledge triples",
@@ -240,15 +380,94 @@ def build_graph(
     return g
 
 
+def _process_all(args, db_path: str, conn: sqlite3.Connection, model) -> None:
+    """Process every conversation passing --min-exchanges into a directory.
+
+    Conversations run concurrently on a thread pool: one script invocation
+    pays provider init once, and while one conversation serializes its graph
+    another's Gemini calls are in flight. Each worker opens its own SQLite
+    connection and builds its own graph, so no shared mutable state crosses
+    threads.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Filter on the shared connection before fanning out
+    eligible = []
+    for conv in get_conversations(conn):
+        cid = conv["conversation_id"]
+        substantive = sum(
+            1 for e in iter_exchanges(conn, cid)
+            if len(extract_query_text(e["input"]).strip()) > 30
+        )
+        if substantive >= args.min_exchanges:
+            eligible.append(cid)
+    conn.close()
+
+    if not eligible:
+        print("No conversations pass the --min-exchanges filter.", file=sys.stderr)
+        return
+
+    print(
+        f"Processing {len(eligible)} conversations with {args.workers} workers",
+        file=sys.stderr,
+    )
+
+    def _one(cid: str) -> tuple[str, int]:
+        g = build_graph(
+            db_path, cid,
+            skip_extraction=args.skip_extraction,
+            model=model,
+            developer=args.developer,
+        )
+        kt_count = sum(1 for _ in g.subjects(RDF.type, DEVKG.KnowledgeTriple))
+        if kt_count < args.min_triples and not args.skip_extraction:
+            print(
+                f"  [{cid[:12]}] only {kt_count} knowledge triples "
+                f"(minimum: {args.min_triples}). Skipping output.",
+                file=sys.stderr,
+            )
+            return cid, 0
+        out_path = out_dir / f"{slug(cid)}.ttl"
+        g.serialize(destination=str(out_path), format="turtle")
+        return cid, len(g)
+
+    written = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(_one, cid): cid for cid in eligible}
+        for future in as_completed(futures):
+            cid = futures[future]
+            try:
+                _, n_triples = future.result()
+            except Exception as e:
+                print(f"  [{cid[:12]}] failed: {e}", file=sys.stderr)
+                continue
+            if n_triples:
+                written += 1
+                print(f"  [{cid[:12]}] wrote {n_triples} RDF triples", file=sys.stderr)
+
+    print(f"Done: {written}/{len(eligible)} conversations written to {out_dir}", file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert Warp terminal AI conversations to RDF Turtle"
     )
-    parser.add_argument("output", help="Path to output Turtle file")
+    parser.add_argument("output", help="Path to output Turtle file (a directory with --all)")
     parser.add_argument(
         "--conversation", type=int, default=None,
         help="Conversation index (from listing). Omit to list available conversations.",
     )
+    parser.add_argument(
+        "--all", action="store_true",
+        help="Process every conversation passing --min-exchanges; output is a directory",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Concurrent conversations with --all (default: 4)",
+    )
     parser.add_argument(
         "--db-path", type=str, default=None,
         help=f"Path to warp.sqlite (default: {DEFAULT_DB_PATH})",
@@ -276,13 +495,25 @@ def main():
         print(f"Error: Database not found: {db_path}", file=sys.stderr)
         sys.exit(1)
 
+    conn = open_db(db_path)
+
+    # Bulk mode: process every eligible conversation concurrently
+    if args.all:
+        model = None
+        if not args.skip_extraction:
+            from pipeline.llm_providers import get_provider
+            model = get_provider(provider_name=args.provider, model_name=args.model)
+        _process_all(args, db_path, conn, model)
+        sys.exit(0)
+
     # List mode: no --conversation specified
     if args.conversation is None:
-        list_conversations(db_path)
+        list_conversations(conn, db_path)
+        conn.close()
         sys.exit(0)
 
     # Get conversation by index
-    conversations = get_conversations(db_path)
+    conversations = get_conversations(conn)
     if args.conversation < 0 or args.conversation >= len(conversations):
         print(
             f"Error: Invalid conversation index {args.conversation}. "
@@ -302,9 +533,13 @@ def main():
         from pipeline.llm_providers import get_provider
         gemini_model = get_provider(provider_name=args.provider, model_name=args.model)
 
-    # Quality filter: check minimum substantive exchanges
-    exchanges = get_exchanges(db_path, conversation_id)
-    substantive = [e for e in exchanges if len(extract_query_text(e["input"]).strip()) > 30]
+    # Quality filter: check minimum substantive exchanges (streamed — only
+    # the substantive rows are kept in memory)
+    substantive = [
+        e for e in iter_exchanges(conn, conversation_id)
+        if len(extract_query_text(e["input"]).strip()) > 30
+    ]
+    conn.close()
     if len(substantive) < args.min_exchanges:
         print(
             f"Skipping conversation {conversation_id}: "